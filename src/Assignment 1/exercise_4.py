@@ -3,26 +3,33 @@ from matplotlib import pyplot as plt
 from flows import *
 from flow_field import FlowField
 
-uniform = UniformFlow(10)
 
-h_values = np.linspace(0.1, 1, 100)
-c_l = np.zeros(len(h_values))
-for i, h in enumerate(h_values):
+def compute_lift_coefficient(h: float) -> float:
+    """
+    Calculate the lift coefficient of the airfoil in ground effect at a height h.
+
+    :param h: height of the airfoil above the ground.
+    :return: lift coefficient.
+    """
     f = FlowField(size=(20, 10), plot=False)
 
-    f.add(uniform)
+    f.add(UniformFlow(10))
     f.add_wing_ground_effect(10, 0, h)
 
-    c_l[i] = f.get_lift_coefficient(1)
+    return f.get_lift_coefficient(1)
+
 
-c_l_infinity = 2 * np.pi * np.sin(10 * np.pi / 180)
+if __name__ == "__main__":
+    h_values = np.linspace(0.1, 1, 100)
 
+    c_l = np.array([compute_lift_coefficient(h) for h in h_values])
 
-fig, ax = plt.subplots()
-ax.set_title(r"Airfoil in Ground Effect (AOA = $10\degree$)")
-ax.set(xlim=(0, 1), ylim=(0, 13), xlabel="$h/c$", ylabel=r"$C_L$")
-ax.plot([0, 1], [c_l_infinity, c_l_infinity], "k--", label=r"$C_{L\infty}$")
-ax.plot(h_values, c_l, "r", label=r"$C_L$")
-ax.legend()
-plt.show()
+    c_l_infinity = 2 * np.pi * np.sin(10 * np.pi / 180)
 
+    fig, ax = plt.subplots()
+    ax.set_title(r"Airfoil in Ground Effect (AOA = $10\degree$)")
+    ax.set(xlim=(0, 1), ylim=(0, 13), xlabel="$h/c$", ylabel=r"$C_L$")
+    ax.plot([0, 1], [c_l_infinity, c_l_infinity], "k--", label=r"$C_{L\infty}$")
+    ax.plot(h_values, c_l, "r", label=r"$C_L$")
+    ax.legend()
+    plt.show()
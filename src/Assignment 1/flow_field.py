@@ -1,10 +1,26 @@
+from functools import cached_property
 from typing import Optional
 
 from flows import *
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.colors import LinearSegmentedColormap
 import scipy
 
+try:
+    from flow_field_numba import FUNCTION_CODES, accumulate_scalar_field, accumulate_velocity_field
+    from streamlines_numba import stream_lines
+except ImportError:
+    # numba is optional, without it the streamlines are integrated in python and the numba device is not available
+    accumulate_scalar_field = None
+    accumulate_velocity_field = None
+    stream_lines = None
+
+try:
+    import flow_field_cuda
+except ImportError:
+    flow_field_cuda = None
+
 
 class FlowField:
     """
@@ -14,6 +30,11 @@ class FlowField:
     Uses the principle of superposition to calculate the flow properties throughout the flow.
     """
 
+    _block_size = 64  # size of the square blocks the grid is evaluated in when numba is not available
+    _dtype = np.float32  # precision of the plotted grids, single precision is plenty for plotting
+    _rgb_lut = None  # lookup table of the colors of _rgb, see _rgb_lookup_table
+    _stream_line_buffer_size = 1024  # initial number of points of the path of a stream line integrated in python
+
     def __init__(
         self,
         size: tuple[int, int],
@@ -21,7 +42,8 @@ class FlowField:
         resolution: Optional[tuple[int, int]] = None,
         arrow_length: float = 1,
         equal_axis: bool = False,
-            plot: bool = True
+            plot: bool = True,
+        device: str = "cpu",
     ) -> None:
         """
         Initializes the flow field.
@@ -31,16 +53,31 @@ class FlowField:
         :param resolution: resolution of the flow field in the x and y direction.
         :param arrow_length: length of the arrows displayed for the velocity flow field.
         :param equal_axis: whether the axis of the flow field should be equal or not.
-        """
+        :param device: device the scalar fields are evaluated on. Either "cpu" for numpy, "numba" for compiled
+         kernels on all cpu cores, or "cuda" for an NVIDIA gpu. The compiled kernels have a fixed start-up cost per
+         process, so they only pay off for large grids with many flows.
+        """
+        if device == "cuda":
+            if flow_field_cuda is None or not flow_field_cuda.is_available():
+                raise Exception("CUDA is not available, use the cpu device instead.")
+        elif device == "numba":
+            if accumulate_scalar_field is None:
+                raise Exception("Numba is not available, use the cpu device instead.")
+        elif device != "cpu":
+            raise Exception('Invalid device. Either "cpu", "numba" or "cuda".')
+
         self.size = size
         self.center = center
         self.arrow_length = arrow_length
         self.equal_axis = equal_axis
         self._has_cylinder = False
         self._cylinder_radius = -1
+        self._cylinder_r2 = 0  # square of the cylinder radius
+        self._cylinder_masks = {}  # masks of the points inside the cylinder per grid, see _cylinder_mask
         self._cylinder_x_0 = 0
         self._cylinder_y_0 = 0
         self._has_plot = plot
+        self.device = device
 
         # if no resolution is passed in the flow field make the resolution equal to the size.
         if resolution is None:
@@ -50,8 +87,9 @@ class FlowField:
 
         self.flows = []  # list to add the canonical flows to
 
-        if plot:
-            self.fig, self.ax = plt.subplots()
+        # the figure is only created once something is plotted, see _ensure_axes
+        self.fig = None
+        self.ax = None
 
         # min and max coordinates of the flow field
         self.x_min = self.center[0] - self.size[0] / 2
@@ -86,29 +124,26 @@ class FlowField:
         :param x_0: x position of the center of the cylinder.
         :param y_0: y position of the center of the cylinder.
         :param angular_velocity: angular velocity of the cylinder.
-        :param xtol: tolerance for fsolve which solves for the strength of the doublet and vortex.
+        :param xtol: unused, the strengths of the doublet and vortex are solved exactly. Kept for compatibility.
         :return: None
         """
         # these values are used when plotting to not include areas inside the cylinder
         self._cylinder_radius = radius
+        self._cylinder_r2 = radius * radius
         self._has_cylinder = True
         self._cylinder_x_0 = x_0
         self._cylinder_y_0 = y_0
+        self._cylinder_masks.clear()
 
         uniform = self._check_has_uniform_flow()
 
-        doublet = Doublet(x_0, y_0, -1)  # initialize the doublet flow
+        # the velocity of the doublet and the vortex is linear in their strength, so the strengths follow directly
+        # from the velocity of a flow with unit strength at the front edge
+        c_d = Doublet(x_0, y_0, 1).velocity_x(x_0 - radius, y_0)
+        if c_d == 0:
+            raise Exception("The cylinder radius must be larger than 0.")
 
-        # function that calculates the difference between the uniform flow and
-        def doublet_strength(x):
-            doublet.strength = x
-
-            return doublet.velocity_x(x_0 - radius, y_0) + uniform.velocity_x(
-                x_0 - radius, y_0
-            )
-
-        strength = scipy.optimize.fsolve(doublet_strength, np.ones(1), xtol=xtol)
-        doublet.strength = strength[0]
+        doublet = Doublet(x_0, y_0, -uniform.velocity_x(x_0 - radius, y_0) / c_d)
 
         self.add(doublet)
 
@@ -116,16 +151,11 @@ class FlowField:
         if angular_velocity is not None:
             surface_velocity = 2 * np.pi * angular_velocity * radius
 
-            vortex = Vortex(x_0, y_0, -1)
-
-            def vortex_strength(x):
-                vortex.strength = x
-
-                return vortex.velocity_y(x_0 - radius, y_0) - surface_velocity
-
-            strength = scipy.optimize.fsolve(vortex_strength, np.ones(1), xtol=xtol)
+            c_v = Vortex(x_0, y_0, 1).velocity_y(x_0 - radius, y_0)
+            if c_v == 0:
+                raise Exception("The cylinder radius must be larger than 0.")
 
-            vortex.strength = strength[0]
+            vortex = Vortex(x_0, y_0, surface_velocity / c_v)
 
             self.add(vortex)
 
@@ -151,17 +181,19 @@ class FlowField:
         x = x_0 + chord * np.cos(aoa) / 2
         y = y_0 + chord * np.sin(aoa) / 2
 
+        # the velocity of the flows already in the flow field does not depend on the strength of the vortex,
+        # so it is evaluated once instead of in every iteration of fsolve
+        u_0 = v_0 = 0
+        for flow in self.flows:
+            du, dv = flow.velocity(x, y)
+            u_0 += du
+            v_0 += dv
+
         def vortex_strength(s):
             vortex.strength = s
 
-            u = v = 0
-            for flow in self.flows:
-                du, dv = flow.velocity(x, y)
-                u += du
-                v += dv
-
-            u += vortex.velocity_x(x, y)
-            v += vortex.velocity_y(x, y)
+            u = u_0 + vortex.velocity_x(x, y)
+            v = v_0 + vortex.velocity_y(x, y)
 
             return -(u * np.sin(aoa)) + (v * np.cos(aoa))
 
@@ -199,36 +231,27 @@ class FlowField:
         x_2 = x_0 + chord * np.cos(-aoa) / 2
         y_2 = -y_0 + chord * np.sin(-aoa) / 2
 
+        # evaluate both control points at once. the uniform flow does not depend on the strength of the vortices,
+        # so it is evaluated once instead of in every iteration of fsolve
+        x_c = np.array([x_1, x_2])
+        y_c = np.array([y_1, y_2])
+        angles = np.array([aoa, -aoa])
+        u_uniform, v_uniform = uniform.velocity_vec(x_c, y_c)
+
         def vortex_strength(s):
             vortex_1.strength = s
             vortex_2.strength = -s
 
-            u_1 = (
-                vortex_1.velocity_x(x_1, y_1)
-                + vortex_2.velocity_x(x_1, y_1)
-                + uniform.velocity_x(x_1, y_1)
-            )
-            v_1 = (
-                vortex_1.velocity_y(x_1, y_1)
-                + vortex_2.velocity_y(x_1, y_1)
-                + uniform.velocity_y(x_1, y_1)
-            )
+            u_1, v_1 = vortex_1.velocity_vec(x_c, y_c)
+            u_2, v_2 = vortex_2.velocity_vec(x_c, y_c)
 
-            u_2 = (
-                vortex_1.velocity_x(x_2, y_2)
-                + vortex_2.velocity_x(x_2, y_2)
-                + uniform.velocity_x(x_2, y_2)
-            )
-            v_2 = (
-                vortex_1.velocity_y(x_2, y_2)
-                + vortex_2.velocity_y(x_2, y_2)
-                + uniform.velocity_y(x_2, y_2)
-            )
+            u = u_1 + u_2 + u_uniform
+            v = v_1 + v_2 + v_uniform
 
-            vel_1 = -(u_1 * np.sin(aoa)) + (v_1 * np.cos(aoa))
-            vel_2 = -(u_2 * np.sin(-aoa)) + (v_2 * np.cos(-aoa))
+            # velocity normal to the wing and to its image at their control points
+            vel = -(u * np.sin(angles)) + (v * np.cos(angles))
 
-            return vel_1 * vel_2
+            return vel[:1] * vel[1:]
 
         strength = scipy.optimize.fsolve(vortex_strength, -np.ones(1))[0]
 
@@ -248,7 +271,8 @@ class FlowField:
         x_values, y_values = self._stream_line(
             x_start, y_start, dt, round(max_iterations)
         )
-        plt.plot(x_values, y_values)
+        self._ensure_axes()
+        self.ax.plot(x_values, y_values)
 
     def plot_stream_function(self, title: str = "Stream Function") -> None:
         """
@@ -260,6 +284,7 @@ class FlowField:
         X, Y, Z = self._get_scalar_field("stream_function")
 
         # plot as a contour
+        self._ensure_axes()
         self.ax.contourf(X, Y, Z)
         self.plot(title)
 
@@ -273,6 +298,7 @@ class FlowField:
         X, Y, Z = self._get_scalar_field("potential_function")
 
         # plot as a contour
+        self._ensure_axes()
         self.ax.contourf(X, Y, Z)
         self.plot(title)
 
@@ -286,6 +312,7 @@ class FlowField:
         X, Y, Z = self._get_scalar_field("velocity_x")
 
         # plot as a contour
+        self._ensure_axes()
         self.ax.contourf(X, Y, Z)
         self.plot(title)
 
@@ -299,6 +326,7 @@ class FlowField:
         X, Y, Z = self._get_scalar_field("velocity_y")
 
         # plot as a contour
+        self._ensure_axes()
         self.ax.contourf(X, Y, Z)
         self.plot(title)
 
@@ -309,58 +337,44 @@ class FlowField:
         :param title: title of the plot.
         :return: None
         """
-        # get the coordinates of all the points where the velocity should be evaluated at.
-        x_values = np.linspace(self.x_min, self.x_max, self.resolution[0])
-        y_values = np.linspace(self.y_min, self.y_max, self.resolution[1])
-
-        # compute the velocity components at each point and sum the contribution of each canonical flow in the flow
-        u_values = np.zeros(self.resolution).T
-        v_values = np.zeros(self.resolution).T
-        z_values = np.zeros(self.resolution).T
-        for i, x in enumerate(x_values):
-            for j, y in enumerate(y_values):
-                if self._is_inside_cylinder(x, y) and self._has_cylinder:
-                    u_values[j, i] = 0
-                    v_values[j, i] = 0
-                else:
-                    for flow in self.flows:
-                        u, v = flow.velocity(x, y)
-                        u_values[j, i] += u
-                        v_values[j, i] += v
-
-                # calculate the absolute velocity for the color map
-                z_values[j, i] = np.sqrt(u_values[j, i] ** 2 + v_values[j, i] ** 2)
+        # compute both velocity components on the velocity grid in a single pass.
+        # the points inside the cylinder have no velocity and are drawn as arrows of zero length.
+        X, Y, u_values, v_values = self._get_velocity_field("_velocity_grid")
+        u_values = u_values.filled(0)
+        v_values = v_values.filled(0)
+
+        # calculate the absolute velocity for the color map
+        z_values = np.hypot(u_values, v_values)
 
         # get min and max velocities for the color map
         min_velocity = np.min(z_values)
         max_velocity = np.max(z_values)
 
-        # plot an arrow at each evaluated point
-        for i, x in enumerate(x_values):
-            for j, y in enumerate(y_values):
-                angle = np.arctan2(v_values[j, i], u_values[j, i])
-                dx = x_values[i] + self.arrow_length * np.cos(angle)
-                dy = y_values[j] + self.arrow_length * np.sin(angle)
-
-                if z_values[j, i] == 0:
-                    self.ax.annotate(
-                        "",
-                        (float(x_values[i]), float(y_values[j])),
-                        (float(x_values[i]), float(y_values[j])),
-                        arrowprops=dict(arrowstyle="->"),
-                    )
-                else:
-                    self.ax.annotate(
-                        "",
-                        (dx, dy),
-                        (float(x_values[i]), float(y_values[j])),
-                        arrowprops=dict(
-                            arrowstyle="->",
-                            color=self._rgb(
-                                float(z_values[j, i]), max_velocity, min_velocity
-                            ),
-                        ),
-                    )
+        # color map with the colors of _rgb between the min and max velocity
+        cmap = LinearSegmentedColormap.from_list(
+            "velocity", self._rgb(np.linspace(min_velocity, max_velocity, 256), max_velocity, min_velocity)
+        )
+
+        # the direction of each arrow is the unit vector of the velocity, no angles needed.
+        # points without any velocity get an arrow of zero length.
+        moving = z_values > 0
+        u_hat = np.divide(u_values, z_values, out=np.zeros_like(z_values), where=moving)
+        v_hat = np.divide(v_values, z_values, out=np.zeros_like(z_values), where=moving)
+
+        # plot all the arrows at once, each with the same length and colored by the absolute velocity.
+        self._ensure_axes()
+        self.ax.quiver(
+            X,
+            Y,
+            self.arrow_length * u_hat,
+            self.arrow_length * v_hat,
+            z_values,
+            cmap=cmap,
+            clim=(min_velocity, max_velocity),
+            angles="xy",
+            scale_units="xy",
+            scale=1,
+        )
 
         # show the plot
         self.plot(title)
@@ -372,13 +386,13 @@ class FlowField:
         :param title: Title of the plot.
         :return: None
         """
-        X, Y, vel_x = self._get_scalar_field("velocity_x")
-        _, _, vel_y = self._get_scalar_field("velocity_y")
+        X, Y, vel_x, vel_y = self._get_velocity_field()
 
         Z = np.sqrt(np.square(vel_x) + np.square(vel_y))
 
-        # plot as a contour
-        self.ax.contourf(X, Y, Z)
+        # plot as a color mesh, which is much faster to draw than a contour for the fine grids used here
+        self._ensure_axes()
+        self.ax.pcolormesh(X, Y, Z, shading="auto")
         self.plot(title)
 
     def plot_pressure_coefficient(self, title: str = "Pressure Coefficient") -> None:
@@ -390,14 +404,12 @@ class FlowField:
         """
         uniform = self._check_has_uniform_flow()
 
-        X, Y, vel_x = self._get_scalar_field("velocity_x")
-        _, _, vel_y = self._get_scalar_field("velocity_y")
+        X, Y, vel_x, vel_y = self._get_velocity_field()
 
-        Z = 1 - np.square(
-            np.sqrt(np.square(vel_x) + np.square(vel_y)) / uniform.freestream_velocity
-        )
+        Z = 1 - (np.square(vel_x) + np.square(vel_y)) / uniform.freestream_velocity**2
 
         # plot as a contour
+        self._ensure_axes()
         self.ax.contourf(X, Y, Z)
         self.plot(title)
 
@@ -417,26 +429,16 @@ class FlowField:
         uniform = self._check_has_uniform_flow()
 
         angles = np.linspace(0, 2 * np.pi, res)
-        x_values = np.zeros(len(angles))
-        y_values = np.zeros(len(angles))
-
-        for i, theta in enumerate(angles):
-            x_values[i] = self._cylinder_radius * np.cos(theta) - self._cylinder_x_0
-            y_values[i] = self._cylinder_radius * np.sin(theta) - self._cylinder_y_0
+        x_values = self._cylinder_radius * np.cos(angles) - self._cylinder_x_0
+        y_values = self._cylinder_radius * np.sin(angles) - self._cylinder_y_0
 
-        surface = np.zeros(len(x_values))
-        for i, (x, y) in enumerate(zip(x_values, y_values)):
-            u = v = 0
-            for flow in self.flows:
-                du, dv = flow.velocity(x, y)
-                u += du
-                v += dv
-                d = 1
+        # evaluate the velocity at all the points on the surface at once
+        u_values, v_values = self._eval_all_velocity(x_values, y_values)
 
-            velocity = np.sqrt(u**2 + v**2)
-            surface[i] = 1 - (velocity / uniform.freestream_velocity) ** 2
+        surface = 1 - (np.hypot(u_values, v_values) / uniform.freestream_velocity) ** 2
 
-        plt.plot(angles, surface, "r")
+        self._ensure_axes()
+        self.ax.plot(angles, surface, "r")
         self.ax.set_title(title)
         self.ax.yaxis.set_inverted(True)
         self.ax.set(
@@ -453,8 +455,7 @@ class FlowField:
         :param title: title of the plot.
         :return: None
         """
-        if not self._has_plot:
-            raise Exception("Flow Field instance has plot set to False.")
+        self._ensure_axes()
 
         if title is None:
             title = "Flow Field"
@@ -494,23 +495,61 @@ class FlowField:
         if x_start is None:
             x_start = self.x_min
 
+        x_0 = np.full(num, float(x_start))
         y_0 = np.linspace(self.y_min, self.y_max, num)
 
-        for y in y_0:
-            x_values, y_values = self._stream_line(
-                x_start, y, dt, round(max_iterations)
+        # velocity at the seeds of the streamlines
+        u = np.zeros(num)
+        v = np.zeros(num)
+        for flow in self.flows:
+            du, dv = flow.velocity_vec(x_0, y_0)
+            u += du
+            v += dv
+
+        # seeds without any velocity, or on the edge of the flow field pointing out of it, give no streamline.
+        # they are not integrated, but still plotted as a single point so the other streamlines keep their colors.
+        skip = (u == 0) & (v == 0)
+        skip |= ((x_0 == self.x_min) & (u < 0)) | ((x_0 == self.x_max) & (u > 0))
+        skip |= ((y_0 == self.y_min) & (v < 0)) | ((y_0 == self.y_max) & (v > 0))
+
+        lines = [(x_0[s : s + 1], y_0[s : s + 1]) for s in range(num)]
+        seeds = np.flatnonzero(~skip)
+
+        if stream_lines is not None:
+            # integrate all the streamlines in parallel
+            kinds, params = self._flow_parameters()
+            x_values, y_values, offsets = stream_lines(
+                kinds,
+                params,
+                x_0[seeds],
+                y_0[seeds],
+                dt,
+                round(max_iterations),
+                (self.x_min, self.x_max, self.y_min, self.y_max),
             )
-            plt.plot(x_values, y_values)
+            for k, s in enumerate(seeds):
+                lines[s] = (
+                    x_values[offsets[k] : offsets[k + 1]],
+                    y_values[offsets[k] : offsets[k + 1]],
+                )
+        else:
+            for s in seeds:
+                lines[s] = self._stream_line(x_0[s], y_0[s], dt, round(max_iterations))
+
+        self._ensure_axes()
+        for x_values, y_values in lines:
+            self.ax.plot(x_values, y_values)
 
         # show the plot
         self.plot(title)
 
     def get_lift_coefficient(self, length: Optional[float] = None) -> float:
         """
-        Calculate the lift coefficient.
+        Calculate the lift coefficient with the Kutta-Joukowski theorem, directly from the strength of the vortex.
+        The flow field itself is not evaluated.
 
         :param length: characteristic length for the calculation of the lift coefficient.
-        :return:
+        :return: lift coefficient.
         """
         if length is None:
             length = 2 * self._cylinder_radius
@@ -520,34 +559,244 @@ class FlowField:
 
         return abs(2 * vortex.strength / uniform.freestream_velocity / length)
 
+    @cached_property
+    def _grid(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Private property with the coordinates the scalar fields are evaluated at.
+        The grid only depends on the size of the flow field, so it is computed once and shared by all plots.
+
+        :return: x values, y values and their meshgrid X, Y. X and Y are row-major arrays of shape
+         (len(y_values), len(x_values)), the shape all the field arrays are allocated in.
+        """
+        x_values = np.linspace(self.x_min, self.x_max, self.size[0] * 10, dtype=self._dtype)
+        y_values = np.linspace(self.y_min, self.y_max, self.size[1] * 10, dtype=self._dtype)
+
+        return x_values, y_values, *np.meshgrid(x_values, y_values, indexing="xy")
+
+    @cached_property
+    def _velocity_grid(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Private property with the coordinates the velocity arrows are evaluated at.
+        The grid only depends on the resolution of the flow field, so it is computed once and shared by all plots.
+
+        :return: x values, y values and their meshgrid X, Y. X and Y are row-major arrays of shape
+         (len(y_values), len(x_values)), the shape all the field arrays are allocated in.
+        """
+        x_values = np.linspace(self.x_min, self.x_max, self.resolution[0], dtype=self._dtype)
+        y_values = np.linspace(self.y_min, self.y_max, self.resolution[1], dtype=self._dtype)
+
+        return x_values, y_values, *np.meshgrid(x_values, y_values, indexing="xy")
+
     def _get_scalar_field(self, function) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
-        Private method that evaluates and plots the scalar values of the function in the flow field.
+        Private method that evaluates the scalar values of the function on the grid of the flow field.
+        Every canonical flow is evaluated on the whole grid at once.
 
         :param function: function of the canonical flows to be evaluated.
-        :return: None
+        :return: x values and y values of the grid, and the masked array of the function values at each grid point.
         """
         # get the coordinates of all the points where the function should be evaluated at.
-        x_values = np.linspace(self.x_min, self.x_max, self.size[0] * 10)
-        y_values = np.linspace(self.y_min, self.y_max, self.size[1] * 10)
-
-        # compute the function at each point and sum the contribution of each canonical flow in the flow field
-        z_values = np.zeros((self.size[0] * 10, self.size[1] * 10)).T
-        mask = np.zeros((self.size[0] * 10, self.size[1] * 10)).T
-        for i, x in enumerate(x_values):
-            for j, y in enumerate(y_values):
-                if self._is_inside_cylinder(x, y) and self._has_cylinder:
-                    mask[j, i] = 1
-                else:
-                    for flow in self.flows:
-                        method = getattr(flow, function)
-                        z_values[j, i] += method(x, y)
+        x_values, y_values, X, Y = self._grid
+
+        z_values = np.zeros_like(X)
+        if self.device == "cuda":
+            # sum the contribution of each canonical flow with one gpu thread per grid point
+            kinds, params = self._flow_parameters()
+            flow_field_cuda.accumulate_scalar_field_cuda(
+                FUNCTION_CODES[function], kinds, params, x_values, y_values, z_values
+            )
+        elif self.device == "numba":
+            # sum the contribution of each canonical flow in a single compiled pass over the grid
+            kinds, params = self._flow_parameters()
+            accumulate_scalar_field(
+                FUNCTION_CODES[function], kinds, params, x_values, y_values, z_values
+            )
+        else:
+            # compute the function one block of the grid at a time and sum the contribution of each canonical flow in
+            # the flow field. the block stays in cache while all the flows are added to it.
+            methods = [getattr(flow, function + "_vec") for flow in self.flows]
+
+            # everything the block loop needs of each flow is looked up once, instead of once per block
+            _, x_0, y_0, _, _, _, radius = self._flow_arrays()
+            flow_blocks = list(zip(self.flows, methods, x_0, y_0, radius, np.isinf(radius)))
+
+            # every flow is evaluated into the same scratch block, instead of allocating a new array per flow
+            b = self._block_size
+            scratch = np.empty((b, b), dtype=z_values.dtype)
+            for j in range(0, z_values.shape[0], b):
+                for i in range(0, z_values.shape[1], b):
+                    z_block = z_values[j : j + b, i : i + b]
+                    X_block = X[j : j + b, i : i + b]
+                    Y_block = Y[j : j + b, i : i + b]
+                    s_block = scratch[: z_block.shape[0], : z_block.shape[1]]
+
+                    # center and half diagonal of the block
+                    x_c = (X_block[0, 0] + X_block[0, -1]) / 2
+                    y_c = (Y_block[0, 0] + Y_block[-1, 0]) / 2
+                    half_diagonal = np.hypot(X_block[0, -1] - x_c, Y_block[-1, 0] - y_c)
+
+                    for flow, method, x_0, y_0, radius, infinite in flow_blocks:
+                        if infinite:
+                            z_block += method(X_block, Y_block, out=s_block)
+                        # skip the flow if the whole block is outside its influence radius
+                        elif np.hypot(x_c - x_0, y_c - y_0) <= radius + half_diagonal:
+                            method(X_block, Y_block, out=s_block)
+                            s_block[~flow.influence_mask_vec(X_block, Y_block)] = 0
+                            z_block += s_block
+
+        # the points inside the cylinder are not part of the flow
+        mask = self._cylinder_mask("_grid")
+        if mask is not np.ma.nomask:
+            z_values[mask] = 0
+
+            # the masked array gets its own copy of the mask, so the cached mask cannot be changed through it
+            mask = mask.copy()
 
         return x_values, y_values, np.ma.masked_array(z_values, mask=mask)
 
+    def _get_velocity_field(
+        self, grid: str = "_grid"
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Private method that evaluates both velocity components on a grid of the flow field in a single pass.
+
+        :param grid: name of the grid to evaluate the velocity on, either "_grid" or "_velocity_grid".
+        :return: X and Y of the grid, and the masked arrays of the velocity in the x direction and y direction at each
+         grid point.
+        """
+        x_values, y_values, X, Y = getattr(self, grid)
+
+        if self.device == "cuda":
+            # the gpu kernel evaluates one scalar function at a time
+            kinds, params = self._flow_parameters()
+            U = np.zeros_like(X)
+            V = np.zeros_like(X)
+            for function, out in (("velocity_x", U), ("velocity_y", V)):
+                flow_field_cuda.accumulate_scalar_field_cuda(
+                    FUNCTION_CODES[function], kinds, params, x_values, y_values, out
+                )
+        elif self.device == "numba":
+            # sum the contribution of each canonical flow to both components in a single compiled pass over the grid
+            kinds, params = self._flow_parameters()
+            U = np.zeros_like(X)
+            V = np.zeros_like(X)
+            accumulate_velocity_field(kinds, params, x_values, y_values, U, V)
+        else:
+            U, V = self._eval_all_velocity(X, Y)
+
+        # the points inside the cylinder are not part of the flow
+        mask = self._cylinder_mask(grid)
+        if mask is not np.ma.nomask:
+            U[mask] = 0
+            V[mask] = 0
+
+            # the masked arrays get their own copy of the mask, so the cached mask cannot be changed through them
+            return X, Y, np.ma.masked_array(U, mask=mask.copy()), np.ma.masked_array(V, mask=mask.copy())
+
+        return X, Y, np.ma.masked_array(U), np.ma.masked_array(V)
+
+    def _flow_arrays(
+        self,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Private method that gathers the parameters of the canonical flows into one array per parameter, so all flows of
+        a type can be evaluated at once. The arrays are built from the flows on every call, so they always match the
+        flows, also after a flow is changed.
+
+        :return: flow type code, x_0, y_0, strength, angle, freestream velocity and influence radius of each flow.
+         The center and strength of a uniform flow are 0, as are the angle and freestream velocity of the other flows.
+        """
+        kinds = np.array([flow.kind for flow in self.flows], dtype=np.int8)
+
+        values = np.zeros((len(self.flows), 6))
+        for k, flow in enumerate(self.flows):
+            if isinstance(flow, UniformFlow):
+                values[k] = 0, 0, 0, flow.angle, flow.freestream_velocity, flow.influence_radius
+            else:
+                values[k] = flow.x_0, flow.y_0, flow.strength, 0, 0, flow.influence_radius
+
+        return kinds, *values.T
+
+    def _flow_parameters(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Private method that stacks the arrays of the canonical flows into a table that can be passed to the compiled kernels.
+
+        :return: flow type code of each flow, and the parameters of each flow as rows of
+         x_0, y_0, strength, cos(angle), sin(angle), influence radius squared.
+        """
+        kinds, x_0, y_0, strength, angle, vfree, radius = self._flow_arrays()
+        uniform = kinds == UNIFORM_FLOW
+
+        # an infinite influence radius is stored as the largest finite float, as the kernels assume finite math
+        params = np.column_stack(
+            (
+                x_0,
+                y_0,
+                np.where(uniform, vfree, strength),
+                np.cos(angle),
+                np.sin(angle),
+                np.minimum(radius**2, np.finfo(np.float64).max),
+            )
+        )
+
+        return kinds, params
+
+    def _eval_all_velocity(self, X: np.ndarray, Y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Private method that evaluates the velocity of all the canonical flows on the points X, Y.
+        The flows are grouped by type and all flows of a type are evaluated at once, by broadcasting the points against
+        the flows. Flows are neglected outside their influence radius.
+
+        :param X: x positions to evaluate the velocity at.
+        :param Y: y positions to evaluate the velocity at.
+        :return: velocity in the x direction and y direction at the points.
+        """
+        kinds, x_0, y_0, strength, angle, vfree, radius = self._flow_arrays()
+
+        U = np.zeros_like(X)
+        V = np.zeros_like(Y)
+
+        # the uniform flows do not depend on the position
+        uniform = kinds == UNIFORM_FLOW
+        U += np.sum(vfree[uniform] * np.cos(angle[uniform]))
+        V += np.sum(vfree[uniform] * np.sin(angle[uniform]))
+
+        # the velocity of each type is evaluated with the same formulas as the flows themselves
+        for kind, flow_type in ((VORTEX, Vortex), (SOURCE_SINK, SourceSink), (DOUBLET, Doublet)):
+            flows = kinds == kind
+            if not flows.any():
+                continue
+
+            # points along the first axes, flows along the last axis
+            dx = X[..., None] - x_0[flows]
+            dy = Y[..., None] - y_0[flows]
+            r2 = dx**2 + dy**2
+
+            # the flows are not defined at their center and neglected outside their influence radius, like in
+            # velocity_vec and influence_mask_vec of the flows. an infinite distance makes their contribution zero.
+            r2[((dx == 0) & (dy == 0)) | (r2 >= radius[flows] ** 2)] = np.inf
+
+            U += np.sum(flow_type.local_velocity_x(strength[flows], dx, dy, r2), axis=-1)
+            V += np.sum(flow_type.local_velocity_y(strength[flows], dx, dy, r2), axis=-1)
+
+        return U, V
+
+    def _ensure_axes(self) -> None:
+        """
+        Private method that creates the figure and axes of the flow field the first time something is plotted,
+        so flow fields that are never plotted do not create a figure.
+
+        :return: None
+        """
+        if not self._has_plot:
+            raise Exception("Flow Field instance has plot set to False.")
+
+        if self.ax is None:
+            self.fig, self.ax = plt.subplots()
+
     def _stream_line(
         self, x_start: float, y_start: float, dt: float, max_iterations: int
-    ) -> tuple[list[float], list[float]]:
+    ) -> tuple[np.ndarray, np.ndarray]:
         """
         Private method that calculates the path of a streamline starting at x_start, y_start in the flow field.
 
@@ -557,95 +806,150 @@ class FlowField:
         :param max_iterations: maximum number of iterations of calculating the streamlines.
         :return: x and y values of the streamlines.
         """
-        x_values = [x_start]
-        y_values = [y_start]
+        if stream_lines is not None:
+            # integrate with the compiled kernel, as a single seed
+            kinds, params = self._flow_parameters()
+            x_values, y_values, _ = stream_lines(
+                kinds,
+                params,
+                np.array([float(x_start)]),
+                np.array([float(y_start)]),
+                dt,
+                max_iterations,
+                (self.x_min, self.x_max, self.y_min, self.y_max),
+            )
 
-        i = 0
-        while (
-            self.y_min <= y_values[-1] <= self.y_max
-            and self.x_min <= x_values[-1] <= self.x_max
-            and i < max_iterations
-        ):
+            return x_values, y_values
+
+        # the path is stored in buffers that double in size when they are full, the current position is kept in
+        # scalars
+        x_values = np.empty(min(max_iterations + 1, self._stream_line_buffer_size))
+        y_values = np.empty_like(x_values)
+        x = x_values[0] = x_start
+        y = y_values[0] = y_start
+
+        velocities = [flow.velocity for flow in self.flows]
+
+        # the bounds are kept in locals, they are checked every step
+        x_min, x_max, y_min, y_max = self.x_min, self.x_max, self.y_min, self.y_max
+
+        n = 0
+        while y_min <= y <= y_max and x_min <= x <= x_max and n < max_iterations:
             u = v = 0
-            for flow in self.flows:
-                du, dv = flow.velocity(x_values[-1], y_values[-1])
+            for velocity in velocities:
+                du, dv = velocity(x, y)
 
                 u += du
                 v += dv
 
-            x_values.append(x_values[-1] + u * dt)
-            y_values.append(y_values[-1] + v * dt)
+            x = x + u * dt
+            y = y + v * dt
 
-            i += 1
+            n += 1
+            if n == len(x_values):
+                size = min(2 * len(x_values), max_iterations + 1)
+                x_values = np.concatenate((x_values, np.empty(size - len(x_values))))
+                y_values = np.concatenate((y_values, np.empty(size - len(y_values))))
 
-        return x_values, y_values
+            x_values[n] = x
+            y_values[n] = y
+
+        # copy the filled part, so the unused part of the buffers is freed
+        return x_values[: n + 1].copy(), y_values[: n + 1].copy()
 
     def _check_has_uniform_flow(self) -> UniformFlow:
         """
         Checks if the user has added a uniform flow to the flow field.
 
-        :return: The uniform flow field object, if present.
+        :return: The last added uniform flow field object, if present.
         """
-        has_uniform = False
-        uniform = 0
-        for flow in self.flows:
+        # search from the end, so the search stops at the last added uniform flow
+        for flow in reversed(self.flows):
             if isinstance(flow, UniformFlow):
-                has_uniform = True
-                uniform = flow
-        if not has_uniform:
-            raise Exception("Must define a Uniform Flow.")
+                return flow
 
-        return uniform
+        raise Exception("Must define a Uniform Flow.")
 
     def _check_has_vortex(self) -> Vortex:
         """
-        Checks if the user has added a uniform flow to the flow field.
+        Checks if the user has added a vortex to the flow field.
 
-        :return: The uniform flow field object, if present.
+        :return: The last added vortex object, if present.
         """
-        has_vortex = False
-        vortex = 0
-        for flow in self.flows:
+        # search from the end, so the search stops at the last added vortex
+        for flow in reversed(self.flows):
             if isinstance(flow, Vortex):
-                has_vortex = True
-                vortex = flow
-        if not has_vortex:
-            raise Exception("Must define a Uniform Flow.")
+                return flow
 
-        return vortex
+        raise Exception("Must define a Vortex.")
 
-    def _is_inside_cylinder(self, x, y) -> bool:
+    def _is_inside_cylinder(self, x, y) -> bool | np.ndarray:
         """
-        Checks whether a given point is inside the cylinder.
+        Checks whether a given point, or each point of the given arrays, is inside the cylinder.
 
-        :param x: x coordinate to evaluate.
-        :param y: y coordinate to evaluate.
+        :param x: x coordinate(s) to evaluate.
+        :param y: y coordinate(s) to evaluate.
         :return: True, if inside the cylinder, False otherwise.
         """
         x = x - self._cylinder_x_0
         y = y - self._cylinder_y_0
 
-        r = np.sqrt(x**2 + y**2)
+        return x * x + y * y < self._cylinder_r2
+
+    def _cylinder_mask(self, grid: str) -> np.ndarray:
+        """
+        Private method that returns the mask of the points of a grid that are inside the cylinder.
+        The mask is only computed once per grid, until a cylinder is added.
+
+        :param grid: name of the grid, either "_grid" or "_velocity_grid".
+        :return: boolean array that is True for the points inside the cylinder, or np.ma.nomask without a cylinder.
+        """
+        # without a cylinder no point is masked, which the masked arrays handle without a mask array
+        if not self._has_cylinder:
+            return np.ma.nomask
+
+        if grid not in self._cylinder_masks:
+            _, _, X, Y = getattr(self, grid)
+            self._cylinder_masks[grid] = self._is_inside_cylinder(X, Y)
 
-        return True if r < self._cylinder_radius else False
+        return self._cylinder_masks[grid]
 
-    @staticmethod
+    @classmethod
     def _rgb(
-        value: float, max_value: float, min_value: float = 0
-    ) -> tuple[float, float, float]:
+        cls, values: float | np.ndarray, max_value: float, min_value: float = 0
+    ) -> np.ndarray:
         """
-        Convert a scalar value to an RGB value.
+        Convert scalar values to RGB values.
 
-        :param value: value to be converted.
-        :param max_value: maximum of the value.
-        :param min_value: minimum of the value.
-        :return: rgb color values between 0-1
+        :param values: value, or array of values, to be converted.
+        :param max_value: maximum of the values.
+        :param min_value: minimum of the values.
+        :return: rgb color values between 0-1, with the r, g, b components along the last axis.
         """
-        # map the input value from min-max to 0-pi
-        x = value * np.pi / (max_value - min_value)
+        lut = cls._rgb_lookup_table()
+        n = len(lut)
+
+        # map the input values from min-max to 0-pi, expressed as an index of the lookup table.
+        # the table covers one period of 2 pi, after which the colors repeat.
+        index = np.rint(np.asarray(values) * (n / 2 / (max_value - min_value))).astype(int) % n
+
+        return lut[index]
+
+    @classmethod
+    def _rgb_lookup_table(cls, n: int = 256) -> np.ndarray:
+        """
+        Private method that computes the colors of _rgb once, at n equally spaced angles over one period.
+
+        :param n: number of colors in the lookup table.
+        :return: lookup table of shape (n, 3) with the rgb color values between 0-1.
+        """
+        if cls._rgb_lut is None or len(cls._rgb_lut) != n:
+            x = np.linspace(0, 2 * np.pi, n, endpoint=False)
+
+            b = (np.cos(x) + 1) / 2
+            g = (np.sin(x) + 1) / 2
+            r = (-np.cos(x) + 1) / 2
 
-        b = (np.cos(x) + 1) / 2
-        g = (np.sin(x) + 1) / 2
-        r = (-np.cos(x) + 1) / 2
+            cls._rgb_lut = np.stack([r, g, b], axis=-1)
 
-        return r, g, b
\ No newline at end of file
+        return cls._rgb_lut
@@ -0,0 +1,91 @@
+import math
+
+import numpy as np
+from numba import cuda
+
+from flow_field_numba import scalar_contribution
+
+THREADS_PER_BLOCK = (16, 16)
+
+_scalar_contribution = cuda.jit(device=True)(scalar_contribution)
+
+
+@cuda.jit
+def _scalar_field_kernel(function, kinds, params, x_values, y_values, out):
+    """
+    Sums the contribution of every canonical flow to a scalar function, with one gpu thread per grid point.
+
+    :param function: code of the scalar function to evaluate, see FUNCTION_CODES.
+    :param kinds: flow type code of each flow.
+    :param params: parameters of each flow as rows of x_0, y_0, strength, cos(angle), sin(angle),
+     influence radius squared.
+    :param x_values: x coordinates of the grid.
+    :param y_values: y coordinates of the grid.
+    :param out: array of shape (len(y_values), len(x_values)) the contributions are added to.
+    :return: None
+    """
+    i, j = cuda.grid(2)
+    if j < out.shape[0] and i < out.shape[1]:
+        value = 0.0
+        for k in range(kinds.shape[0]):
+            value += _scalar_contribution(
+                function,
+                kinds[k],
+                params[k, 0],
+                params[k, 1],
+                params[k, 2],
+                params[k, 3],
+                params[k, 4],
+                params[k, 5],
+                x_values[i],
+                y_values[j],
+            )
+
+        out[j, i] += value
+
+
+def is_available() -> bool:
+    """
+    Checks whether a CUDA gpu can be used.
+
+    :return: True, if a CUDA gpu is available, False otherwise.
+    """
+    return cuda.is_available()
+
+
+def accumulate_scalar_field_cuda(
+    function: int,
+    kinds: np.ndarray,
+    params: np.ndarray,
+    x_values: np.ndarray,
+    y_values: np.ndarray,
+    out: np.ndarray,
+) -> None:
+    """
+    Sums the contribution of every canonical flow to a scalar function on the gpu.
+    Same interface as accumulate_scalar_field, the result is copied back into out.
+
+    :param function: code of the scalar function to evaluate, see FUNCTION_CODES.
+    :param kinds: flow type code of each flow.
+    :param params: parameters of each flow as rows of x_0, y_0, strength, cos(angle), sin(angle),
+     influence radius squared.
+    :param x_values: x coordinates of the grid.
+    :param y_values: y coordinates of the grid.
+    :param out: array of shape (len(y_values), len(x_values)) the contributions are added to.
+    :return: None
+    """
+    blocks = (
+        math.ceil(out.shape[1] / THREADS_PER_BLOCK[0]),
+        math.ceil(out.shape[0] / THREADS_PER_BLOCK[1]),
+    )
+
+    device_out = cuda.to_device(out)
+    _scalar_field_kernel[blocks, THREADS_PER_BLOCK](
+        function,
+        cuda.to_device(kinds),
+        cuda.to_device(params),
+        cuda.to_device(x_values),
+        cuda.to_device(y_values),
+        device_out,
+    )
+    device_out.copy_to_host(out)
@@ -0,0 +1,225 @@
+import math
+
+import numpy as np
+from numba import njit, prange
+
+from flows import UNIFORM_FLOW, VORTEX, SOURCE_SINK, DOUBLET
+
+# integer codes of the scalar functions that can be accumulated over the flow field
+STREAM_FUNCTION = 0
+POTENTIAL_FUNCTION = 1
+VELOCITY_X = 2
+VELOCITY_Y = 3
+
+FUNCTION_CODES = {
+    "stream_function": STREAM_FUNCTION,
+    "potential_function": POTENTIAL_FUNCTION,
+    "velocity_x": VELOCITY_X,
+    "velocity_y": VELOCITY_Y,
+}
+
+
+def scalar_contribution(
+    function: int,
+    kind: int,
+    x_0: float,
+    y_0: float,
+    strength: float,
+    cos_a: float,
+    sin_a: float,
+    radius_2: float,
+    x: float,
+    y: float,
+) -> float:
+    """
+    Evaluates a scalar function of a single canonical flow at a single x, y position.
+    Written with the math module only, so it can be compiled for both the cpu and the gpu.
+
+    :param function: code of the scalar function to evaluate, see FUNCTION_CODES.
+    :param kind: flow type code of the flow.
+    :param x_0: x position of the center of the flow.
+    :param y_0: y position of the center of the flow.
+    :param strength: strength of the flow. The strength of a uniform flow is its freestream velocity.
+    :param cos_a: cosine of the angle of a uniform flow.
+    :param sin_a: sine of the angle of a uniform flow.
+    :param radius_2: square of the influence radius of the flow, beyond which it is neglected.
+    :param x: x position to evaluate the function at.
+    :param y: y position to evaluate the function at.
+    :return: the scalar function of the flow evaluated at the x, y position.
+    """
+    if kind == UNIFORM_FLOW:
+        if function == STREAM_FUNCTION:
+            return strength * (y * cos_a - x * sin_a)
+        elif function == POTENTIAL_FUNCTION:
+            return strength * (x * cos_a + y * sin_a)
+        elif function == VELOCITY_X:
+            return strength * cos_a
+        else:
+            return strength * sin_a
+
+    dx = x - x_0
+    dy = y - y_0
+
+    # the flows are not defined at their center
+    if dx == 0 and dy == 0:
+        return 0.0
+
+    r2 = dx * dx + dy * dy
+    k_2pi = strength / 2 / math.pi
+
+    # the flow is neglected outside its influence radius
+    if r2 >= radius_2:
+        return 0.0
+
+    if kind == VORTEX:
+        if function == STREAM_FUNCTION:
+            return -k_2pi * 0.5 * math.log(r2)
+        elif function == POTENTIAL_FUNCTION:
+            return k_2pi * math.atan2(dy, dx)
+        elif function == VELOCITY_X:
+            return -k_2pi * dy / r2
+        else:
+            return k_2pi * dx / r2
+    elif kind == SOURCE_SINK:
+        if function == STREAM_FUNCTION:
+            return k_2pi * math.atan2(dy, dx)
+        elif function == POTENTIAL_FUNCTION:
+            return k_2pi * 0.5 * math.log(r2)
+        elif function == VELOCITY_X:
+            return k_2pi * dx / r2
+        else:
+            return k_2pi * dy / r2
+    elif kind == DOUBLET:
+        if function == STREAM_FUNCTION:
+            return -k_2pi * dy / r2
+        elif function == POTENTIAL_FUNCTION:
+            return k_2pi * dx / r2
+        elif function == VELOCITY_X:
+            return strength * (dx * dx - dy * dy) / (r2 * r2)
+        else:
+            return strength * 2 * dx * dy / (r2 * r2)
+
+    return 0.0
+
+
+# compiled once and cached on disk, so later processes load it instead of compiling it again
+_scalar_contribution = njit(cache=True)(scalar_contribution)
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def accumulate_scalar_field(
+    function: int,
+    kinds: np.ndarray,
+    params: np.ndarray,
+    x_values: np.ndarray,
+    y_values: np.ndarray,
+    out: np.ndarray,
+) -> None:
+    """
+    Sums the contribution of every canonical flow to a scalar function in a single pass over the grid.
+    The rows of the grid are evaluated in parallel.
+
+    :param function: code of the scalar function to evaluate, see FUNCTION_CODES.
+    :param kinds: flow type code of each flow.
+    :param params: parameters of each flow as rows of x_0, y_0, strength, cos(angle), sin(angle),
+     influence radius squared.
+     The strength of a uniform flow is its freestream velocity.
+    :param x_values: x coordinates of the grid.
+    :param y_values: y coordinates of the grid.
+    :param out: array of shape (len(y_values), len(x_values)) the contributions are added to.
+    :return: None
+    """
+    for j in prange(y_values.shape[0]):
+        y = y_values[j]
+        for i in range(x_values.shape[0]):
+            x = x_values[i]
+            value = 0.0
+            for k in range(kinds.shape[0]):
+                value += _scalar_contribution(
+                    function,
+                    kinds[k],
+                    params[k, 0],
+                    params[k, 1],
+                    params[k, 2],
+                    params[k, 3],
+                    params[k, 4],
+                    params[k, 5],
+                    x,
+                    y,
+                )
+
+            out[j, i] += value
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def accumulate_velocity_field(
+    kinds: np.ndarray,
+    params: np.ndarray,
+    x_values: np.ndarray,
+    y_values: np.ndarray,
+    u_out: np.ndarray,
+    v_out: np.ndarray,
+) -> None:
+    """
+    Sums the contribution of every canonical flow to both velocity components in a single pass over the grid.
+    The rows of the grid are evaluated in parallel.
+
+    :param kinds: flow type code of each flow.
+    :param params: parameters of each flow as rows of x_0, y_0, strength, cos(angle), sin(angle),
+     influence radius squared.
+     The strength of a uniform flow is its freestream velocity.
+    :param x_values: x coordinates of the grid.
+    :param y_values: y coordinates of the grid.
+    :param u_out: array of shape (len(y_values), len(x_values)) the velocity in the x direction is added to.
+    :param v_out: array of shape (len(y_values), len(x_values)) the velocity in the y direction is added to.
+    :return: None
+    """
+    for j in prange(y_values.shape[0]):
+        y = y_values[j]
+        for i in range(x_values.shape[0]):
+            x = x_values[i]
+            u = 0.0
+            v = 0.0
+            for k in range(kinds.shape[0]):
+                kind = kinds[k]
+                x_0 = params[k, 0]
+                y_0 = params[k, 1]
+                strength = params[k, 2]
+                cos_a = params[k, 3]
+                sin_a = params[k, 4]
+                radius_2 = params[k, 5]
+                u += _scalar_contribution(VELOCITY_X, kind, x_0, y_0, strength, cos_a, sin_a, radius_2, x, y)
+                v += _scalar_contribution(VELOCITY_Y, kind, x_0, y_0, strength, cos_a, sin_a, radius_2, x, y)
+
+            u_out[j, i] += u
+            v_out[j, i] += v
+
+
+@njit(cache=True)
+def flow_velocity(
+    kinds: np.ndarray, params: np.ndarray, x: float, y: float
+) -> tuple[float, float]:
+    """
+    Sums the velocity contribution of every canonical flow at a single x, y position.
+
+    :param kinds: flow type code of each flow.
+    :param params: parameters of each flow as rows of x_0, y_0, strength, cos(angle), sin(angle),
+     influence radius squared. The influence radius is not used for the velocity.
+    :param x: x position to evaluate the velocity at.
+    :param y: y position to evaluate the velocity at.
+    :return: velocity in the x direction and y direction at the x, y position.
+    """
+    u = 0.0
+    v = 0.0
+    for k in range(kinds.shape[0]):
+        kind = kinds[k]
+        x_0 = params[k, 0]
+        y_0 = params[k, 1]
+        strength = params[k, 2]
+        cos_a = params[k, 3]
+        sin_a = params[k, 4]
+        # an infinite influence radius, so no flow is neglected
+        u += _scalar_contribution(VELOCITY_X, kind, x_0, y_0, strength, cos_a, sin_a, math.inf, x, y)
+        v += _scalar_contribution(VELOCITY_Y, kind, x_0, y_0, strength, cos_a, sin_a, math.inf, x, y)
+
+    return u, v
@@ -1,6 +1,15 @@
 from abc import ABC, abstractmethod
+import math
+from typing import Optional
+
 import numpy as np
 
+# integer codes of the canonical flow types, used to identify the flows in the compiled kernels
+UNIFORM_FLOW = 0
+VORTEX = 1
+SOURCE_SINK = 2
+DOUBLET = 3
+
 
 class BaseFlow(ABC):
     """
@@ -12,6 +21,9 @@ class BaseFlow(ABC):
      function for each of the canonical flows.
     """
 
+    kind: int  # integer code of the flow type
+    influence_radius = np.inf  # distance beyond which the flow is neglected in the plotted scalar and velocity fields
+
     def __init__(self, x_0: float, y_0: float) -> None:
         """
         Base initialize method. Sets the origin of the flow type.
@@ -75,6 +87,143 @@ class BaseFlow(ABC):
         """
         return self.velocity(x, y)[1]
 
+    @abstractmethod
+    def stream_function_vec(
+        self, x: np.ndarray, y: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Vectorized stream function of the flow type, evaluated at every given x, y position at once.
+
+        :param x: array of x positions to evaluate the stream function at.
+        :param y: array of y positions to evaluate the stream function at.
+        :param out: optional array to store the result in, instead of allocating a new one.
+        :return: array of the stream function evaluated at the x, y positions.
+        """
+        pass
+
+    @abstractmethod
+    def potential_function_vec(
+        self, x: np.ndarray, y: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Vectorized potential function of the flow type, evaluated at every given x, y position at once.
+
+        :param x: array of x positions to evaluate the potential function at.
+        :param y: array of y positions to evaluate the potential function at.
+        :param out: optional array to store the result in, instead of allocating a new one.
+        :return: array of the potential function evaluated at the x, y positions.
+        """
+        pass
+
+    def velocity_vec(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        out: Optional[tuple[np.ndarray, np.ndarray]] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized velocity components of the flow type, evaluated at every given x, y position at once.
+
+        :param x: array of x positions to evaluate the velocity at.
+        :param y: array of y positions to evaluate the velocity at.
+        :param out: optional pair of arrays to store the velocity components in, instead of allocating new ones.
+        :return: arrays of the velocity in the x direction and y direction evaluated at the x, y positions.
+        """
+        x, y, r2, center = self._local_cartesian_vec(x, y)
+        u_out, v_out = (None, None) if out is None else out
+
+        u = self.local_velocity_x(self.strength, x, y, r2, out=u_out)
+        v = self.local_velocity_y(self.strength, x, y, r2, out=v_out)
+        u[center] = 0
+        v[center] = 0
+
+        return u, v
+
+    @staticmethod
+    def local_velocity_x(
+        strength: np.ndarray, x: np.ndarray, y: np.ndarray, r2: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Velocity in the x direction of flows of the flow type, at positions in the local coordinate system of the flows.
+        This is the only definition of the vectorized velocity of the flow type. It is used both by the flow itself and
+        by the flow field, which evaluates all the flows of a type at once by broadcasting the positions against them.
+
+        :param strength: strength of the flows.
+        :param x: array of local x positions.
+        :param y: array of local y positions.
+        :param r2: array of the squared distances of the positions to the center of the flows.
+        :param out: optional array to store the result in, instead of allocating a new one.
+        :return: array of the velocity in the x direction at the positions.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def local_velocity_y(
+        strength: np.ndarray, x: np.ndarray, y: np.ndarray, r2: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Velocity in the y direction of flows of the flow type, at positions in the local coordinate system of the flows.
+        See local_velocity_x.
+
+        :param strength: strength of the flows.
+        :param x: array of local x positions.
+        :param y: array of local y positions.
+        :param r2: array of the squared distances of the positions to the center of the flows.
+        :param out: optional array to store the result in, instead of allocating a new one.
+        :return: array of the velocity in the y direction at the positions.
+        """
+        raise NotImplementedError
+
+    def velocity_x_vec(
+        self, x: np.ndarray, y: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Return only the x component of the velocity at every given x, y position.
+
+        :param x: array of x positions to evaluate the velocity at.
+        :param y: array of y positions to evaluate the velocity at.
+        :param out: optional array to store the result in, instead of allocating a new one.
+        :return: array of the x component of the velocity at the given x, y positions.
+        """
+        # only the x component is evaluated, straight into out
+        x, y, r2, center = self._local_cartesian_vec(x, y)
+
+        u = self.local_velocity_x(self.strength, x, y, r2, out=out)
+        u[center] = 0
+
+        return u
+
+    def velocity_y_vec(
+        self, x: np.ndarray, y: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Return only the y component of the velocity at every given x, y position.
+
+        :param x: array of x positions to evaluate the velocity at.
+        :param y: array of y positions to evaluate the velocity at.
+        :param out: optional array to store the result in, instead of allocating a new one.
+        :return: array of the y component of the velocity at the given x, y positions.
+        """
+        # only the y component is evaluated, straight into out
+        x, y, r2, center = self._local_cartesian_vec(x, y)
+
+        v = self.local_velocity_y(self.strength, x, y, r2, out=out)
+        v[center] = 0
+
+        return v
+
+    def influence_mask_vec(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Determines which of the given positions are within the influence radius of the flow.
+
+        :param x: array of x positions.
+        :param y: array of y positions.
+        :return: boolean array, True where the position is within the influence radius of the flow.
+        """
+        x, y = self._transform(x, y)
+
+        return x ** 2 + y ** 2 < self.influence_radius ** 2
+
     def _transform(self,
                    x: float,
                    y: float) -> tuple[float, float]:
@@ -97,8 +246,8 @@ class BaseFlow(ABC):
         :param y: cartesian y position.
         :return: radius and angle that define the given coordinate.
         """
-        r = np.sqrt(x ** 2 + y ** 2)
-        theta = np.arctan2(y, x)
+        r = math.sqrt(x * x + y * y)
+        theta = math.atan2(y, x)
 
         return r, theta
 
@@ -114,8 +263,11 @@ class BaseFlow(ABC):
         :param theta: angle of polar coordinate.
         :return: velocity component in the x direction, velocity component in the y direction.
         """
-        u = u_r * np.cos(theta) - u_theta * np.sin(theta)
-        v = u_r * np.sin(theta) + u_theta * np.cos(theta)
+        cos_theta = math.cos(theta)
+        sin_theta = math.sin(theta)
+
+        u = u_r * cos_theta - u_theta * sin_theta
+        v = u_r * sin_theta + u_theta * cos_theta
 
         return u, v
 
@@ -155,6 +307,47 @@ class BaseFlow(ABC):
         else:
             return False
 
+    def _local_polar_vec(self,
+                         x: np.ndarray,
+                         y: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Transform arrays of global coordinates to polar coordinates in the flow's local coordinate system.
+        Points at the center of the flow get a radius of 1, so they can be evaluated without division by zero
+        warnings. Their values should be replaced using the returned center mask.
+
+        :param x: array of global x positions.
+        :param y: array of global y positions.
+        :return: radius, angle and a boolean mask of the points at the center of the flow.
+        """
+        center = (x == self.x_0) & (y == self.y_0)
+
+        x, y = self._transform(x, y)
+        r = np.sqrt(x ** 2 + y ** 2)
+        theta = np.arctan2(y, x)
+
+        return np.where(center, 1, r), theta, center
+
+    def _local_cartesian_vec(self,
+                             x: np.ndarray,
+                             y: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Transform arrays of global coordinates to the flow's local coordinate system, together with the squared
+        distance to the center. Points at the center of the flow get a squared distance of 1, so they can be evaluated
+        without division by zero warnings. Their values should be replaced using the returned center mask.
+
+        :param x: array of global x positions.
+        :param y: array of global y positions.
+        :return: local x positions, local y positions, squared distance to the center and a boolean mask of the points
+         at the center of the flow.
+        """
+        center = (x == self.x_0) & (y == self.y_0)
+
+        x, y = self._transform(x, y)
+        r2 = x ** 2 + y ** 2
+        r2[center] = 1
+
+        return x, y, r2, center
+
 
 class UniformFlow(BaseFlow):
     """
@@ -162,6 +355,9 @@ class UniformFlow(BaseFlow):
 
     Defines the potential flow functions for a uniform flow.
     """
+
+    kind = UNIFORM_FLOW
+
     def __init__(
         self,
         freestream_velocity: float,
@@ -190,21 +386,85 @@ class UniformFlow(BaseFlow):
         # As a uniform flow is the same everywhere, the center is not important.
         super().__init__(0, 0)
 
+    @property
+    def angle(self) -> float:
+        return self._angle
+
+    @angle.setter
+    def angle(self, angle: float) -> None:
+        # the cosine and sine of the angle are used by the functions of the uniform flow, so they are updated together
+        # with the angle
+        self._angle = angle
+        self._cos_a = np.cos(angle)
+        self._sin_a = np.sin(angle)
+
     def stream_function(self, x: float, y: float) -> float:
         return self.freestream_velocity * (
-            (self.y_0 + y) * np.cos(self.angle) - (self.x_0 + x) * np.sin(self.angle)
+            (self.y_0 + y) * self._cos_a - (self.x_0 + x) * self._sin_a
         )
 
     def potential_function(self, x: float, y: float) -> float:
         return self.freestream_velocity * (
-            (self.x_0 + x) * np.cos(self.angle) + (self.y_0 + y) * np.sin(self.angle)
+            (self.x_0 + x) * self._cos_a + (self.y_0 + y) * self._sin_a
         )
 
     def velocity(self, x: float, y: float) -> tuple[float, float]:
-        u = self.freestream_velocity * np.cos(self.angle)
-        v = self.freestream_velocity * np.sin(self.angle)
+        return self.freestream_velocity * self._cos_a, self.freestream_velocity * self._sin_a
+
+    def stream_function_vec(
+        self, x: np.ndarray, y: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        return np.multiply(
+            (self.y_0 + y) * self._cos_a - (self.x_0 + x) * self._sin_a,
+            self.freestream_velocity,
+            out=out,
+        )
 
-        return u, v
+    def potential_function_vec(
+        self, x: np.ndarray, y: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        return np.multiply(
+            (self.x_0 + x) * self._cos_a + (self.y_0 + y) * self._sin_a,
+            self.freestream_velocity,
+            out=out,
+        )
+
+    def velocity_vec(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        out: Optional[tuple[np.ndarray, np.ndarray]] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        u, v = self.velocity(x, y)
+
+        # the velocity is the same everywhere, so broadcast it to the shape of the given coordinates
+        if out is None:
+            return np.full(np.shape(x), u), np.full(np.shape(x), v)
+
+        out[0].fill(u)
+        out[1].fill(v)
+
+        return out
+
+    def velocity_x_vec(
+        self, x: np.ndarray, y: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        if out is None:
+            return np.full(np.shape(x), self.freestream_velocity * self._cos_a)
+
+        out.fill(self.freestream_velocity * self._cos_a)
+
+        return out
+
+    def velocity_y_vec(
+        self, x: np.ndarray, y: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        if out is None:
+            return np.full(np.shape(x), self.freestream_velocity * self._sin_a)
+
+        out.fill(self.freestream_velocity * self._sin_a)
+
+        return out
 
 
 class Vortex(BaseFlow):
@@ -213,18 +473,40 @@ class Vortex(BaseFlow):
 
     Defines the potential flow functions for a vortex flow.
     """
-    def __init__(self, x_0: float, y_0: float, strength: float) -> None:
+
+    kind = VORTEX
+
+    def __init__(
+        self,
+        x_0: float,
+        y_0: float,
+        strength: float,
+        influence_radius: float = np.inf,
+    ) -> None:
         """
         Initialize the vortex flow class.
 
         :param x_0: x position of the center of the vortex.
         :param y_0: y position of the center of the vortex.
         :param strength: strength of the vortex.
+        :param influence_radius: distance from the center beyond which the flow is neglected when the scalar and
+         velocity fields are plotted. The flow is never neglected by default.
         """
         self.strength = strength
+        self.influence_radius = influence_radius
 
         super().__init__(x_0, y_0)
 
+    @property
+    def strength(self) -> float:
+        return self._strength
+
+    @strength.setter
+    def strength(self, strength: float) -> None:
+        # strength / 2 pi is used by the functions of the vortex, so it is updated together with the strength
+        self._strength = strength
+        self._k = strength / 2 / np.pi
+
     def stream_function(self, x: float, y: float) -> float:
         # check if the given coordinate is at the center of the vortex
         if self._is_center(x, y):
@@ -235,7 +517,7 @@ class Vortex(BaseFlow):
 
         r, theta = self._to_polar_coordinates(x, y)
 
-        return -self.strength * np.log(r) / 2 / np.pi
+        return -self._k * math.log(r)
 
     def potential_function(self, x: float, y: float) -> float:
         # check if the given coordinate is at the center of the vortex
@@ -247,7 +529,7 @@ class Vortex(BaseFlow):
 
         r, theta = self._to_polar_coordinates(x, y)
 
-        return self.strength * theta / 2 / np.pi
+        return self._k * theta
 
     def velocity(self, x: float, y: float) -> tuple[float, float]:
         # check if the given coordinate is at the center of the vortex
@@ -257,12 +539,49 @@ class Vortex(BaseFlow):
         # transform to the local coordinate system
         x, y = self._transform(x, y)
 
-        r, theta = self._to_polar_coordinates(x, y)
+        # the tangential velocity k / r in cartesian components, without the angle
+        r2 = x * x + y * y
+
+        return -self._k * y / r2, self._k * x / r2
+
+    def stream_function_vec(
+        self, x: np.ndarray, y: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        r, theta, center = self._local_polar_vec(x, y)
+
+        out = np.multiply(np.log(r), -self._k, out=out)
+        out[center] = 0
+
+        return out
 
-        u_r = 0
-        u_theta = self.strength / 2 / np.pi / r
+    def potential_function_vec(
+        self, x: np.ndarray, y: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        r, theta, center = self._local_polar_vec(x, y)
 
-        return self._to_cartesian_velocity(u_r, u_theta, theta)
+        out = np.multiply(theta, self._k, out=out)
+        out[center] = 0
+
+        return out
+
+    @staticmethod
+    def local_velocity_x(
+        strength: np.ndarray, x: np.ndarray, y: np.ndarray, r2: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        # the tangential velocity k / r in cartesian components
+        u = np.multiply(y, -strength / 2 / np.pi, out=out)
+        u /= r2
+
+        return u
+
+    @staticmethod
+    def local_velocity_y(
+        strength: np.ndarray, x: np.ndarray, y: np.ndarray, r2: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        v = np.multiply(x, strength / 2 / np.pi, out=out)
+        v /= r2
+
+        return v
 
 
 class SourceSink(BaseFlow):
@@ -271,18 +590,40 @@ class SourceSink(BaseFlow):
 
     Defines the potential flow functions for a source or sink flow.
     """
-    def __init__(self, x_0: float, y_0: float, strength: float) -> None:
+
+    kind = SOURCE_SINK
+
+    def __init__(
+        self,
+        x_0: float,
+        y_0: float,
+        strength: float,
+        influence_radius: float = np.inf,
+    ) -> None:
         """
         Initialize the source sink flow class.
 
         :param x_0: x position of the center of the source.
         :param y_0: y position of the center of the source.
         :param strength: strength of the source or sink. +ive defines a source, -ive defines a sink.
+        :param influence_radius: distance from the center beyond which the flow is neglected when the scalar and
+         velocity fields are plotted. The flow is never neglected by default.
         """
         self.strength = strength
+        self.influence_radius = influence_radius
 
         super().__init__(x_0, y_0)
 
+    @property
+    def strength(self) -> float:
+        return self._strength
+
+    @strength.setter
+    def strength(self, strength: float) -> None:
+        # strength / 2 pi is used by the functions of the source or sink, so it is updated together with the strength
+        self._strength = strength
+        self._k = strength / 2 / np.pi
+
     def stream_function(self, x: float, y: float) -> float:
         # check if the given coordinate is at the center of the source/sink
         if self._is_center(x, y):
@@ -293,7 +634,7 @@ class SourceSink(BaseFlow):
 
         r, theta = self._to_polar_coordinates(x, y)
 
-        return self.strength * theta / 2 / np.pi
+        return self._k * theta
 
     def potential_function(self, x: float, y: float) -> float:
         # check if the given coordinate is at the center of the source/sink
@@ -305,7 +646,7 @@ class SourceSink(BaseFlow):
 
         r, theta = self._to_polar_coordinates(x, y)
 
-        return self.strength * np.log(r) / 2 / np.pi
+        return self._k * math.log(r)
 
     def velocity(self, x: float, y: float) -> tuple[float, float]:
         # check if the given coordinate is at the center of the source/sink
@@ -315,12 +656,49 @@ class SourceSink(BaseFlow):
         # transform to the local coordinate system
         x, y = self._transform(x, y)
 
-        r, theta = self._to_polar_coordinates(x, y)
+        # the radial velocity k / r in cartesian components, without the angle
+        r2 = x * x + y * y
+
+        return self._k * x / r2, self._k * y / r2
+
+    def stream_function_vec(
+        self, x: np.ndarray, y: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        r, theta, center = self._local_polar_vec(x, y)
+
+        out = np.multiply(theta, self._k, out=out)
+        out[center] = 0
 
-        u_r = self.strength / 2 / np.pi / r
-        u_theta = 0
+        return out
 
-        return self._to_cartesian_velocity(u_r, u_theta, theta)
+    def potential_function_vec(
+        self, x: np.ndarray, y: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        r, theta, center = self._local_polar_vec(x, y)
+
+        out = np.multiply(np.log(r), self._k, out=out)
+        out[center] = 0
+
+        return out
+
+    @staticmethod
+    def local_velocity_x(
+        strength: np.ndarray, x: np.ndarray, y: np.ndarray, r2: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        # the radial velocity k / r in cartesian components
+        u = np.multiply(x, strength / 2 / np.pi, out=out)
+        u /= r2
+
+        return u
+
+    @staticmethod
+    def local_velocity_y(
+        strength: np.ndarray, x: np.ndarray, y: np.ndarray, r2: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        v = np.multiply(y, strength / 2 / np.pi, out=out)
+        v /= r2
+
+        return v
 
 
 class Doublet(BaseFlow):
@@ -329,18 +707,40 @@ class Doublet(BaseFlow):
 
     Defines the potential flow functions for a doublet flow.
     """
-    def __init__(self, x_0: float, y_0: float, strength: float) -> None:
+
+    kind = DOUBLET
+
+    def __init__(
+        self,
+        x_0: float,
+        y_0: float,
+        strength: float,
+        influence_radius: float = np.inf,
+    ) -> None:
         """
         Initialize the doublet flow class.
 
         :param x_0: x position of the center of the doublet.
         :param y_0: y position of the center of the doublet.
         :param strength: strength of the doublet.
+        :param influence_radius: distance from the center beyond which the flow is neglected when the scalar and
+         velocity fields are plotted. The flow is never neglected by default.
         """
         self.strength = strength
+        self.influence_radius = influence_radius
 
         super().__init__(x_0, y_0)
 
+    @property
+    def strength(self) -> float:
+        return self._strength
+
+    @strength.setter
+    def strength(self, strength: float) -> None:
+        # strength / 2 pi is used by the functions of the doublet, so it is updated together with the strength
+        self._strength = strength
+        self._k = strength / 2 / np.pi
+
     def stream_function(self, x: float, y: float) -> float:
         # check if the given coordinate is at the center of the doublet
         if self._is_center(x, y):
@@ -351,7 +751,7 @@ class Doublet(BaseFlow):
 
         r, theta = self._to_polar_coordinates(x, y)
 
-        return -self.strength * np.sin(theta) / 2 / np.pi / r
+        return -self._k * math.sin(theta) / r
 
     def potential_function(self, x: float, y: float) -> float:
         # check if the given coordinate is at the center of the doublet
@@ -363,7 +763,7 @@ class Doublet(BaseFlow):
 
         r, theta = self._to_polar_coordinates(x, y)
 
-        return self.strength * np.cos(theta) / 2 / np.pi / r
+        return self._k * math.cos(theta) / r
 
     def velocity(self, x: float, y: float) -> tuple[float, float]:
         # check if the given coordinate is at the center of the doublet
@@ -373,12 +773,52 @@ class Doublet(BaseFlow):
         # transform to the local coordinate system
         x, y = self._transform(x, y)
 
-        r, theta = self._to_polar_coordinates(x, y)
+        # the polar velocity components in cartesian components, without the angle
+        r2 = x * x + y * y
+        r4 = r2 * r2
+
+        return self.strength * (x * x - y * y) / r4, self.strength * 2 * x * y / r4
+
+    def stream_function_vec(
+        self, x: np.ndarray, y: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        r, theta, center = self._local_polar_vec(x, y)
 
-        u_r = self.strength * np.cos(theta) / r ** 2
-        u_theta = self.strength * np.sin(theta) / r ** 2
+        out = np.divide(np.sin(theta), r, out=out)
+        out *= -self._k
+        out[center] = 0
+
+        return out
+
+    def potential_function_vec(
+        self, x: np.ndarray, y: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        r, theta, center = self._local_polar_vec(x, y)
+
+        out = np.divide(np.cos(theta), r, out=out)
+        out *= self._k
+        out[center] = 0
+
+        return out
+
+    @staticmethod
+    def local_velocity_x(
+        strength: np.ndarray, x: np.ndarray, y: np.ndarray, r2: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        u = np.subtract(x ** 2, y ** 2, out=out)
+        u *= strength
+        u /= r2 * r2
+
+        return u
+
+    @staticmethod
+    def local_velocity_y(
+        strength: np.ndarray, x: np.ndarray, y: np.ndarray, r2: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        v = np.multiply(x * y, 2 * strength, out=out)
+        v /= r2 * r2
 
-        return self._to_cartesian_velocity(u_r, u_theta, theta)
+        return v
 
 
 
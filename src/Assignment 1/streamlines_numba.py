@@ -0,0 +1,152 @@
+import numpy as np
+from numba import njit, prange, types
+from numba.typed import List
+
+from flow_field_numba import flow_velocity
+
+STREAM_LINE_CHUNK = 1024  # maximum number of steps per streamline in one round of stream_lines
+
+
+@njit(cache=True)
+def stream_line(
+    kinds: np.ndarray,
+    params: np.ndarray,
+    x: float,
+    y: float,
+    dt: float,
+    max_steps: int,
+    bounds: tuple[float, float, float, float],
+    x_values: np.ndarray,
+    y_values: np.ndarray,
+) -> int:
+    """
+    Continues the path of a streamline from x, y with explicit Euler steps, until it leaves the bounds or the maximum
+    number of steps is reached.
+
+    :param kinds: flow type code of each flow.
+    :param params: parameters of each flow as rows of x_0, y_0, strength, cos(angle), sin(angle),
+     influence radius squared. The influence radius is not used for the streamlines.
+    :param x: x position the streamline continues from.
+    :param y: y position the streamline continues from.
+    :param dt: size of the time step.
+    :param max_steps: maximum number of steps.
+    :param bounds: x_min, x_max, y_min, y_max of the flow field.
+    :param x_values: array of at least max_steps values the x values of the new points are written to.
+    :param y_values: array of at least max_steps values the y values of the new points are written to.
+    :return: number of new points of the streamline.
+    """
+    x_min, x_max, y_min, y_max = bounds
+
+    i = 0
+    while y_min <= y <= y_max and x_min <= x <= x_max and i < max_steps:
+        u, v = flow_velocity(kinds, params, x, y)
+
+        x = x + u * dt
+        y = y + v * dt
+
+        x_values[i] = x
+        y_values[i] = y
+        i += 1
+
+    return i
+
+
+@njit(parallel=True, cache=True)
+def stream_lines(
+    kinds: np.ndarray,
+    params: np.ndarray,
+    x_starts: np.ndarray,
+    y_starts: np.ndarray,
+    dt: float,
+    max_iterations: int,
+    bounds: tuple[float, float, float, float],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Integrates the streamlines of all the seeds in parallel.
+    Every streamline is integrated once, in rounds of at most STREAM_LINE_CHUNK steps into a buffer per round, so
+    the memory does not depend on max_iterations. Once all the streamlines are finished, the buffers are copied into
+    a single pair of arrays.
+
+    :param kinds: flow type code of each flow.
+    :param params: parameters of each flow as rows of x_0, y_0, strength, cos(angle), sin(angle),
+     influence radius squared. The influence radius is not used for the streamlines.
+    :param x_starts: x positions the streamlines start at.
+    :param y_starts: y positions the streamlines start at.
+    :param dt: size of the time step.
+    :param max_iterations: maximum number of iterations per streamline.
+    :param bounds: x_min, x_max, y_min, y_max of the flow field.
+    :return: x and y values of all the streamlines, and the offsets such that streamline s is stored at
+     offsets[s]:offsets[s + 1].
+    """
+    num = x_starts.shape[0]
+
+    # current end point and number of steps of each streamline
+    x_ends = x_starts.copy()
+    y_ends = y_starts.copy()
+    steps = np.zeros(num, dtype=np.int64)
+
+    # seeds, buffers and number of new points of each round
+    round_seeds = List.empty_list(types.int64[:])
+    round_x = List.empty_list(types.float64[:, :])
+    round_y = List.empty_list(types.float64[:, :])
+    round_counts = List.empty_list(types.int64[:])
+
+    seeds = np.arange(num)
+    while seeds.shape[0] > 0:
+        m = seeds.shape[0]
+        x_buffer = np.empty((m, STREAM_LINE_CHUNK))
+        y_buffer = np.empty((m, STREAM_LINE_CHUNK))
+        counts = np.empty(m, dtype=np.int64)
+        for a in prange(m):
+            s = seeds[a]
+            counts[a] = stream_line(
+                kinds,
+                params,
+                x_ends[s],
+                y_ends[s],
+                dt,
+                min(STREAM_LINE_CHUNK, max_iterations - steps[s]),
+                bounds,
+                x_buffer[a],
+                y_buffer[a],
+            )
+            if counts[a] > 0:
+                x_ends[s] = x_buffer[a, counts[a] - 1]
+                y_ends[s] = y_buffer[a, counts[a] - 1]
+            steps[s] += counts[a]
+
+        round_seeds.append(seeds)
+        round_x.append(x_buffer)
+        round_y.append(y_buffer)
+        round_counts.append(counts)
+
+        # a streamline is finished when it left the bounds before the end of the round, or has no steps left
+        unfinished = np.zeros(m, dtype=np.bool_)
+        for a in range(m):
+            unfinished[a] = counts[a] == STREAM_LINE_CHUNK and steps[seeds[a]] < max_iterations
+        seeds = seeds[unfinished]
+
+    offsets = np.zeros(num + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(steps + 1)
+
+    x_values = np.empty(offsets[-1])
+    y_values = np.empty(offsets[-1])
+    positions = offsets[:-1] + 1
+    for s in prange(num):
+        x_values[offsets[s]] = x_starts[s]
+        y_values[offsets[s]] = y_starts[s]
+
+    for r in range(len(round_seeds)):
+        seeds = round_seeds[r]
+        x_buffer = round_x[r]
+        y_buffer = round_y[r]
+        counts = round_counts[r]
+        for a in prange(seeds.shape[0]):
+            s = seeds[a]
+            p = positions[s]
+            n = counts[a]
+            x_values[p : p + n] = x_buffer[a, :n]
+            y_values[p : p + n] = y_buffer[a, :n]
+            positions[s] = p + n
+
+    return x_values, y_values, offsets